@@ -1,38 +1,74 @@
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import configparser
 from datetime import datetime, timezone
+import hashlib
 import os
+import random
 import sys
+import threading
 import time
 from typing import List, Tuple, Dict, Union
 import json
-from urllib.parse import urlparse
-import urllib.error
 
 import gw2_data
+import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 MAX_FIELD_CHARS = 1024
+# Discord limits for a single webhook message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_MESSAGE_EMBED_CHARS = 6000
+
+# Shared session so GW2 API, Google Sheets and Discord calls reuse pooled
+# keep-alive connections. Idempotent requests (GET/DELETE) are retried on
+# rate limits and server errors; POSTs are retried on 429 by safe_post.
+SESSION = requests.Session()
+SESSION.headers.update({"Accept-Encoding": "gzip", "User-Agent": "gw2-wvw-teams"})
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Discord rate-limit state shared by every webhook call, including the threaded
+# deletes: monotonic time until which the bucket is known to be empty
+_RATE_LIMIT_LOCK = threading.Lock()
+_rate_limited_until = 0.0
+
+# Parsed sheet caches for this process, keyed by cache file: (mtime, DataFrame)
+_PARSED_CACHE: Dict[str, Tuple[float, pd.DataFrame]] = {}
 
 
 def cache_data_file(data: Union[Dict[str, str], pd.DataFrame], cache_file: str) -> None:
     """Cache the data dictionary or dataframe to a JSON file."""
     if isinstance(data, pd.DataFrame):
-        # store as records with meta info
+        # store rows as plain lists (column names once, not per row) with meta info
+        split = data.to_dict(orient="split", index=False)
         payload = {
             "_type": "dataframe",
-            "data": data.to_dict(orient="records"),
-            "columns": data.columns.tolist(),
+            "data": split["data"],
+            "columns": split["columns"],
         }
+        indent = None  # table rows stay compact (C encoder)
     elif isinstance(data, dict):
         payload = {"_type": "dict", "data": data}
+        indent = 2  # link/validator caches stay readable for operators
     else:
         raise TypeError(f"Unsupported type {type(data)}")
 
-    with open(cache_file, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    # Serialize in one shot and hand the file a single write.
+    # Write to a temp file and swap it in, so a crash never leaves a truncated cache.
+    tmp_file = f"{cache_file}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        f.write(json.dumps(payload, indent=indent, ensure_ascii=False))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, cache_file)
 
 
 def load_data_file(cache_file: str) -> Dict[str, str]:
@@ -44,6 +80,7 @@ def load_data_file(cache_file: str) -> Dict[str, str]:
         payload = json.load(f)
 
     if payload["_type"] == "dataframe":
+        # rows may be lists or, in older caches, per-row records
         return pd.DataFrame(payload["data"], columns=payload["columns"])
     elif payload["_type"] == "dict":
         return payload["data"]
@@ -51,15 +88,69 @@ def load_data_file(cache_file: str) -> Dict[str, str]:
         return payload["data"]
     
 
-def fetch_north_american_guilds(GW2_NA_GUILDS_API_URL) -> pd.DataFrame:
+def fetch_json_conditional(url: str, cache_file: str, ttl: int = 0, timeout: Tuple[float, float] = (3.0, 5), stale_ok: bool = True):
+    """
+    GET a JSON resource, revalidating a cached copy with If-None-Match/If-Modified-Since.
+
+    A cached copy younger than `ttl` seconds is returned without any request. On
+    HTTP 304 the cached body is returned without re-downloading it; otherwise the
+    fresh body is cached together with its ETag/Last-Modified validators. If the
+    request fails or the body is not JSON, a stale cached body is returned when one
+    exists and `stale_ok` is set; otherwise requests.exceptions.RequestException is
+    raised.
+    """
+    # Validators from the previous response, if any
+    cached = load_data_file(cache_file) or {}
+    if "data" in cached and time.time() - os.path.getmtime(cache_file) < ttl:
+        return cached["data"]
+
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        response = SESSION.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            # Unchanged upstream, reuse the cached body and restart its TTL
+            os.utime(cache_file)
+            return cached["data"]
+        response.raise_for_status()
+        # Parse the JSON bytes straight into a dict, skipping the text decode
+        data = json.loads(response.content)
+    except (requests.exceptions.RequestException, ValueError) as error:
+        # A 200 maintenance page that is not JSON counts as a failed request
+        if not stale_ok or "data" not in cached:
+            if isinstance(error, requests.exceptions.RequestException):
+                raise
+            # Surface a bad body as a request failure, like response.json() would
+            raise requests.exceptions.RequestException(f"{url} returned invalid JSON: {error}") from error
+        print(f"⚠️ {url} unavailable ({error}), using cached copy")
+        return cached["data"]
+
+    os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+    cache_data_file({
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "data": data,
+    }, cache_file)
+    return data
+
+
+def fetch_north_american_guilds(GW2_NA_GUILDS_API_URL, cache_file: str = os.path.join("cache", "na_guilds.json"), ttl: int = 3600) -> pd.DataFrame:
     """
     Fetch the listing of North American Guilds from the Guild Wars 2 API.
 
     The GW2API is queried for the list of North American Guilds. The response is
-    parsed as JSON and returned as a pandas DataFrame.
+    parsed as JSON and returned as a pandas DataFrame. A cached listing younger
+    than `ttl` is used as-is; after that the request is conditional on the cached
+    copy, and a stale copy is used if the API cannot be reached.
 
     Parameters:
-        None
+        GW2_NA_GUILDS_API_URL (str): The GW2API endpoint for NA guild worlds.
+        cache_file (str): Path of the cached response body and validators.
+        ttl (int): Seconds a cached listing is used without contacting the API.
 
     Returns:
         pd.DataFrame: A DataFrame with columns ['guild_id', 'world_id'].
@@ -67,15 +158,14 @@ def fetch_north_american_guilds(GW2_NA_GUILDS_API_URL) -> pd.DataFrame:
     url = GW2_NA_GUILDS_API_URL
 
     try:
-        # Send a GET request to the GW2API with a timeout
-        response = requests.get(url, timeout=(3.0, 5))
-        response.raise_for_status()
-
-        # Parse the JSON into a dict
-        data = response.json()
-
-        # Convert to DataFrame
-        guilds_df = pd.DataFrame(list(data.items()), columns=["guild_id", "world_id"])
+        data = fetch_json_conditional(url, cache_file, ttl=ttl)
+
+        # Convert to DataFrame straight from the dict, without intermediate Python lists
+        guilds_df = (
+            pd.DataFrame.from_dict(data, orient="index", columns=["world_id"])
+            .rename_axis("guild_id")
+            .reset_index()
+        )
         return guilds_df
 
     except requests.exceptions.RequestException as error:
@@ -115,12 +205,13 @@ def detect_world_changes(prev_data: dict, curr_data: dict) -> dict:
     return changes
 
 
-def fetch_match_data(match: str) -> dict:
+def fetch_match_data(match: str, cache_dir: str = "cache") -> dict:
     """
     Fetch match data for a given tier from GW2API.
 
     Parameters:
         match (str): The match ID to fetch data for. Example: '1-1'
+        cache_dir (str): Directory holding the cached response used for revalidation.
 
     Returns:
         dict: The match data as returned by the GW2API. None if the request fails.
@@ -129,22 +220,100 @@ def fetch_match_data(match: str) -> dict:
     url = f'https://api.guildwars2.com/v2/wvw/matches/{match}'
 
     try:
-        # Send a GET request to the GW2API with no timeout
-        response = requests.get(url)
-        # Raise an exception for bad status codes
-        response.raise_for_status()
-        # Parse the JSON response
-        return response.json()
+        # Conditional GET; a 304 reuses the cached match data, but stale scores are
+        # never served when the request fails
+        return fetch_json_conditional(url, os.path.join(cache_dir, f"match_{match}.json"), stale_ok=False)
     except requests.exceptions.RequestException as error:
         # Print an error message if the request fails
         print(f"Error: {error}")
         return None
 
 
+def fetch_match_data_all(matches: List[str], cache_dir: str = "cache", max_workers: int = 8) -> List[dict]:
+    """
+    Fetch match data for several tiers concurrently.
+
+    Parameters:
+        matches (List[str]): The match IDs to fetch. Example: ['1-1', '1-2', '1-3', '1-4']
+        cache_dir (str): Directory holding the cached responses used for revalidation.
+        max_workers (int): Upper bound on simultaneous requests.
+
+    Returns:
+        List[dict]: The match data in the same order as `matches`; None for any failed request.
+    """
+    if not matches:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(matches))) as pool:
+        return list(pool.map(lambda match: fetch_match_data(match, cache_dir), matches))
+
+
+def _download_sheet(url: str, cache_file: str, usecols: List[int], retries: int = 3, delay: float = 2.0) -> float:
+    """
+    Refresh one published sheet's cache over the pooled session.
+
+    The ETag/Last-Modified saved with the cached copy are sent back, so an unchanged
+    sheet answers 304 and only the cache's TTL is restarted; otherwise the exact
+    server payload replaces the cache once it parses as the expected CSV, and its
+    new validators are saved after that. Google Sheets answers transient HTTP 400s,
+    so those are retried up to `retries` attempts with a growing delay. Returns the
+    cache file's new mtime.
+    """
+    validators_file = os.path.splitext(cache_file)[0] + ".etag"
+    # Validators are only worth sending while the copy they describe exists
+    validators = (load_data_file(validators_file) or {}) if os.path.exists(cache_file) else {}
+
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    for attempt in range(1, retries + 1):
+        response = SESSION.get(url, headers=headers, timeout=30)
+        if response.status_code == 400 and attempt < retries:
+            time.sleep(delay * attempt)  # back off before retrying
+            continue
+        break
+    if response.status_code == 304:
+        # Unchanged upstream, keep the cached CSV and restart its TTL
+        os.utime(cache_file)
+        return os.stat(cache_file).st_mtime
+    response.raise_for_status()
+
+    # Parse the payload before swapping it in, so an HTML error page or a truncated
+    # body never becomes a "fresh" cache (or gets pinned by its ETag)
+    tmp_file = f"{cache_file}.tmp"
+    try:
+        with open(tmp_file, "wb") as f:
+            f.write(response.content)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            df = pd.read_csv(tmp_file, usecols=usecols, dtype=str)
+        except ValueError as error:
+            raise ValueError(f"{url} did not return the expected sheet CSV: {error}") from error
+        os.replace(tmp_file, cache_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+    mtime = os.stat(cache_file).st_mtime
+    _PARSED_CACHE[cache_file] = (mtime, df)  # already parsed, no need to read it again
+    cache_data_file({
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }, validators_file)
+    return mtime
+
+
 def fetch_guild_data(ALLIANCES_REMOTE_SHEET_URL: str, SOLO_GUILDS_REMOTE_SHEET_URL: str, cache_dir: str = "cache", ttl: int = 3600, retries: int = 3, delay: float = 2.0):
     """
     Fetches data from the 'Alliances' and 'SoloGuilds' worksheets of the WvW Guilds Google Spreadsheet.
-    Always uses a local cache to avoid hitting Google unnecessarily.
+    Always uses a local cache to avoid hitting Google unnecessarily: a copy younger
+    than `ttl` seconds is used as is, an older one is revalidated with a conditional
+    GET. Google Sheets HTTP 400s are retried `retries` times with a backoff of
+    `delay` seconds per attempt; other transient failures are retried by the
+    shared SESSION.
     
     - Alliances: only columns A, C, V, W are kept.
     - SoloGuilds: only columns A, S, V are kept.
@@ -158,36 +327,46 @@ def fetch_guild_data(ALLIANCES_REMOTE_SHEET_URL: str, SOLO_GUILDS_REMOTE_SHEET_U
         "Alliances": alliances_csv_url,
         "SoloGuilds": soloGuilds_csv_url
     }
+    # Only these columns are used downstream
+    keep_cols = {
+        "Alliances": [0, 2, 21, 22],  # A, C, V, W
+        "SoloGuilds": [0, 18, 21],    # A, S, V
+    }
 
-    results = {}
-    for name, url in urls.items():
-        cache_file = os.path.join(cache_dir, f"{name}.csv")
+    cache_files = {name: os.path.join(cache_dir, f"{name}.csv") for name in urls}
+
+    # Refresh the caches that are missing or older than the TTL; the two sheets are
+    # independent, so stale ones are downloaded side by side
+    mtimes = {}
+    for name, cache_file in cache_files.items():
+        # One stat per file; a missing file is simply stale
+        try:
+            mtime = os.stat(cache_file).st_mtime
+        except FileNotFoundError:
+            continue
+        if time.time() - mtime < ttl:
+            mtimes[name] = mtime
+    stale = [name for name in cache_files if name not in mtimes]
+    if stale:
+        with ThreadPoolExecutor(max_workers=len(stale)) as pool:
+            futures = {name: pool.submit(_download_sheet, urls[name], cache_files[name], keep_cols[name], retries, delay) for name in stale}
+            for name, future in futures.items():
+                mtimes[name] = future.result()  # re-raises download errors in the caller
 
-        # Check if cached version is valid
-        if os.path.exists(cache_file) and time.time() - os.path.getmtime(cache_file) < ttl:
-            df = pd.read_csv(cache_file)
+    results = {}
+    for name, cache_file in cache_files.items():
+        # Parse only the kept columns, once per version of the cache file
+        mtime = mtimes[name]
+        parsed = _PARSED_CACHE.get(cache_file)
+        if parsed is not None and parsed[0] == mtime:
+            # Already parsed in this process and unchanged on disk
+            df = parsed[1]
         else:
-            # Fetch fresh data with retries
-            for attempt in range(1, retries + 1):
-                try:
-                    df = pd.read_csv(url)
-                    df.to_csv(cache_file, index=False)
-                    break
-                except urllib.error.HTTPError as e:
-                    if e.code == 400 and attempt < retries:
-                        time.sleep(delay * attempt)  # exponential backoff
-                    else:
-                        raise  # re-raise if retries exhausted
-
-        # Keep only selected columns
-        if name == "Alliances":
-            keep_cols = [0, 2, 21, 22]  # A, C, V, W
-            df = df.iloc[:, keep_cols]
-        elif name == "SoloGuilds":
-            keep_cols = [0, 18, 21]  # A, S, V
-            df = df.iloc[:, keep_cols]
-
-        results[name] = df
+            df = pd.read_csv(cache_file, usecols=keep_cols[name], dtype=str)
+            _PARSED_CACHE[cache_file] = (mtime, df)
+
+        # Hand out a copy so callers cannot alter the memoized frame
+        results[name] = df.copy()
 
     return results["Alliances"], results["SoloGuilds"]
 
@@ -200,17 +379,42 @@ def fetch_guild_data_local(alliances_file: str = "WvW Guilds - Alliances.csv",
     - Alliances: only columns A, C, V, W are kept.
     - SoloGuilds: only columns A, S, V are kept.
     """
-    alliances = pd.read_csv(alliances_file, usecols=[0, 2, 21, 22], encoding='utf-8')  # A, C, V, W
-    solo_guilds = pd.read_csv(solo_file, usecols=[0, 18, 21], encoding='utf-8')        # A, S, V
+    alliances = pd.read_csv(alliances_file, usecols=[0, 2, 21, 22], encoding='utf-8', dtype=str)  # A, C, V, W
+    solo_guilds = pd.read_csv(solo_file, usecols=[0, 18, 21], encoding='utf-8', dtype=str)        # A, S, V
 
     return alliances, solo_guilds
 
 
+def _apply_world_moves(
+    df: pd.DataFrame,
+    keys: pd.Series,
+    world_col: str,
+    new_world: pd.Series,
+    changed: Dict[str, str],
+    unchanged: Dict[str, str]
+) -> pd.DataFrame:
+    """
+    Return df with world_col set to new_world wherever that is a non-empty, different
+    world, recording the outcome per key in the changed/unchanged dictionaries.
+    """
+    current_world = df[world_col]
+    moved = new_world.ne("") & new_world.ne(current_world)
+
+    changed.update(zip(
+        keys[moved],
+        "Moved from " + current_world[moved].astype(str) + " to " + new_world[moved].astype(str)
+    ))
+    stayed = current_world[~moved].mask(current_world[~moved].eq(""), new_world[~moved])
+    unchanged.update(zip(keys[~moved], "Remained on " + stayed.astype(str)))
+
+    return df.assign(**{world_col: current_world.mask(moved, new_world)})
+
+
 def update_world_ids(
     alliances_df: pd.DataFrame,
     solo_guilds_df: pd.DataFrame,
     guild_world_ids: pd.DataFrame,
-    world_id_map: Dict[int, str],
+    world_id_map: Dict[str, str],
     alliance_id_col: str = 'Alliance Guild IDs:',
     alliance_name_col: str = 'Alliance:',
     alliance_world_col: str = 'World ID',
@@ -224,7 +428,7 @@ def update_world_ids(
         alliances_df (pd.DataFrame): DataFrame with alliances data.
         solo_guilds_df (pd.DataFrame): DataFrame with solo guilds data.
         guild_world_ids (pd.DataFrame): DataFrame with guild_id and world_id columns.
-        world_id_map (Dict[int, str]): Mapping of world IDs to world names.
+        world_id_map (Dict[str, str]): Mapping of world IDs to world names.
         alliance_id_col (str): Column name for alliance guild IDs.
         alliance_name_col (str): Column name for alliance names.
         alliance_world_col (str): Column name for alliance world IDs.
@@ -252,61 +456,38 @@ def update_world_ids(
     changed = {}
     unchanged = {}
 
-    # Normalize guild IDs to uppercase
-    alliances_df = alliances_df.copy()
-    solo_guilds_df = solo_guilds_df.copy()
-    guild_world_ids = guild_world_ids.copy()
-    guild_world_ids['guild_id'] = guild_world_ids['guild_id'].str.upper()
-    alliances_df[alliance_id_col] = alliances_df[alliance_id_col].str.upper()
-    solo_guilds_df[solo_id_col] = solo_guilds_df[solo_id_col].str.upper()
+    # Build the guild -> world name lookup once, keyed on upper-cased guild IDs.
+    # Rows are resolved with a hash lookup instead of a merge, so the input
+    # frames are never copied or mutated.
+    world_by_guild = {
+        guild_id.upper(): world_id_map.get(str(world_id), "")
+        for guild_id, world_id in zip(guild_world_ids['guild_id'], guild_world_ids['world_id'])
+    }
 
     # Update alliances_df
-    alliances_df = alliances_df.merge(
-        guild_world_ids[['guild_id', 'world_id']],
-        how='left',
-        left_on=alliance_id_col,
-        right_on='guild_id'
+    new_alliance_worlds = alliances_df[alliance_id_col].str.upper().map(world_by_guild).fillna("")
+    alliances_df = _apply_world_moves(
+        alliances_df, alliances_df[alliance_name_col], alliance_world_col, new_alliance_worlds, changed, unchanged
     )
-    alliances_df['new_world_name'] = alliances_df['world_id'].fillna("")
-    
-    # Track changes for alliances
-    for _, row in alliances_df.iterrows():
-        alliance_name = row[alliance_name_col]
-        current_world = row[alliance_world_col]
-        new_world = row['new_world_name']
-        if new_world and new_world != current_world:
-            changed[alliance_name] = f"Moved from {current_world} to {new_world}"
-            alliances_df.loc[alliances_df[alliance_name_col] == alliance_name, alliance_world_col] = new_world
-        else:
-            unchanged[alliance_name] = f"Remained on {current_world or new_world}"
 
     # Update solo_guilds_df
-    solo_guilds_df = solo_guilds_df.merge(
-        guild_world_ids[['guild_id', 'world_id']],
-        how='left',
-        left_on=solo_id_col,
-        right_on='guild_id'
+    solo_ids = solo_guilds_df[solo_id_col].str.upper()
+    new_solo_worlds = solo_ids.map(world_by_guild).fillna("")
+    solo_guilds_df = _apply_world_moves(
+        solo_guilds_df, solo_ids, solo_world_col, new_solo_worlds, changed, unchanged
     )
-    solo_guilds_df['new_world_name'] = solo_guilds_df['world_id'].fillna("")
-    
-    # Track changes for solo guilds
-    for _, row in solo_guilds_df.iterrows():
-        guild_id = row[solo_id_col]
-        current_world = row[solo_world_col]
-        new_world = row['new_world_name']
-        if new_world and new_world != current_world:
-            changed[guild_id] = f"Moved from {current_world} to {new_world}"
-            solo_guilds_df.loc[solo_guilds_df[solo_id_col] == guild_id, solo_world_col] = new_world
-        else:
-            unchanged[guild_id] = f"Remained on {current_world or new_world}"
-
-    # Clean up temporary columns
-    alliances_df = alliances_df.drop(columns=['guild_id', 'world_id', 'new_world_name'], errors='ignore')
-    solo_guilds_df = solo_guilds_df.drop(columns=['guild_id', 'world_id', 'new_world_name'], errors='ignore')
 
     return alliances_df, solo_guilds_df, changed, unchanged
 
 
+def frame_digest(*frames: pd.DataFrame) -> str:
+    """Content fingerprint of one or more DataFrames (values and row order, index ignored)."""
+    digest = hashlib.blake2b(digest_size=16)
+    for df in frames:
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
 def compare_cached_to_current(cached_df: pd.DataFrame, current_df: pd.DataFrame) -> dict:
     """
     Compare cached and current alliance DataFrames.
@@ -361,86 +542,151 @@ def compare_cached_to_current(cached_df: pd.DataFrame, current_df: pd.DataFrame)
     }
 
 
-def build_guild_embeds(world_name: str, alliances: pd.DataFrame, solo_guilds: pd.DataFrame) -> List[dict]:
+def build_guild_embeds(world_name: str, alliances: pd.DataFrame, solo_guild_names: List[str], timestamp: str) -> List[dict]:
     """Build embeds for a world, auto-splitting alliances if too long."""
-    alliance_blocks = []
-    for index, row in alliances.iterrows():
-        block_lines = [f"**{row['Alliance:']}**"]  # alliance name
-        alliance_guild_list = row['Guilds'].split("\n")
-        for guild in alliance_guild_list:
-            block_lines.append(f"-  {guild}")
-        alliance_blocks.append("\n".join(block_lines))
-
-    embeds, current_alliances, current_length = [], [], 0
-    part = 1  # track part numbers
-    for block in alliance_blocks:
-        block_len = len(block) + 2
-        if current_length + block_len > MAX_FIELD_CHARS and current_alliances:
-            # add previous chunk
-            title = world_name if part == 1 else f"{world_name} (part-{part})"
-            embeds.append(make_embed(title, "\n\n".join(current_alliances)))
-            part += 1
-            current_alliances, current_length = [], 0
-        current_alliances.append(block)
-        current_length += block_len
-
-    if current_alliances:
+    # Bold alliance name followed by one "-  " bullet per guild, built column-wise
+    blocks = (
+        "**" + alliances['Alliance:'] + "**\n-  "
+        + alliances['Guilds'].str.replace("\n", "\n-  ", regex=False)
+    )
+    alliance_blocks = blocks.tolist()
+
+    # Greedy chunking on prefix sums: each chunk takes every following block whose
+    # running length (block + 2 separator chars) stays within MAX_FIELD_CHARS.
+    cumulative = np.cumsum(blocks.str.len().to_numpy(dtype=np.int64) + 2)
+
+    embeds, start, part = [], 0, 1  # track part numbers
+    while start < len(alliance_blocks):
+        used = cumulative[start - 1] if start else 0
+        end = int(np.searchsorted(cumulative, used + MAX_FIELD_CHARS, side="right"))
+        end = max(end, start + 1)  # an oversized block still gets its own embed
         title = world_name if part == 1 else f"{world_name} (part-{part})"
-        embeds.append(make_embed(title, "\n\n".join(current_alliances)))
+        embeds.append(make_embed(title, "\n\n".join(alliance_blocks[start:end]), timestamp))
+        part += 1
+        start = end
 
     # Attach solo guilds to last embed
     if embeds:
-        world_solo_guilds = []
-        for solo_index, solo_row in solo_guilds.iterrows():
-            world_solo_guilds.append(solo_row['Solo Guilds'])
-        solo_text = "\n".join(world_solo_guilds) if world_solo_guilds else "None"
+        solo_text = "\n".join(solo_guild_names) if solo_guild_names else "None"
         embeds[-1]["fields"].append({"name": "__Solo Guilds__", "value": solo_text})
 
     return embeds
 
 
-def make_embed(world_name: str, alliance_text: str) -> dict:
+# Constant parts of every guild list embed, built once; make_embed shallow-copies
+# it and the nested dicts are shared read-only between embeds.
+_EMBED_TEMPLATE = {
+    "author": {
+        "name": "WvW Teams",
+        "icon_url": "https://avatars.githubusercontent.com/u/16168556?v=4",
+        "url": "https://github.com/Drevarr"
+    },
+    "thumbnail": {
+        "url": "https://cdn.discordapp.com/attachments/1198282509960618025/1198282510770122853/Alliance_Logo_NA_UPDATED3.png"
+    },
+    "footer": {"text": "Last Updated:"},
+}
+
+
+def make_embed(world_name: str, alliance_text: str, timestamp: str) -> dict:
     """Base embed template."""
-    return {
-        "author": {
-            "name": "WvW Teams",
-            "icon_url": "https://avatars.githubusercontent.com/u/16168556?v=4",
-            "url": "https://github.com/Drevarr"
-        },
-        "title": f"{world_name} Guild List",
-        "fields": [{"name": "__**Alliances**__", "value": alliance_text}],
-        "thumbnail": {
-            "url": "https://cdn.discordapp.com/attachments/1198282509960618025/1198282510770122853/Alliance_Logo_NA_UPDATED3.png"
-        },
-        "footer": {"text": "Last Updated:"},
-        "timestamp": datetime.now(timezone.utc).isoformat() 
-    }
+    embed = _EMBED_TEMPLATE.copy()
+    embed["title"] = f"{world_name} Guild List"
+    embed["fields"] = [{"name": "__**Alliances**__", "value": alliance_text}]
+    embed["timestamp"] = timestamp
+    return embed
+
+
+def record_rate_limit(resp: requests.Response) -> None:
+    """Remember when Discord's rate-limit bucket resets if the response says it is empty."""
+    global _rate_limited_until
+    if resp.headers.get("X-RateLimit-Remaining") == "0":
+        reset_at = time.monotonic() + float(resp.headers.get("X-RateLimit-Reset-After", 0))
+        with _RATE_LIMIT_LOCK:
+            _rate_limited_until = max(_rate_limited_until, reset_at)
 
 
-def safe_post(webhook_url, payload):
+def wait_for_rate_limit() -> None:
+    """Sleep before the next Discord request, but only while the bucket is known to be empty."""
+    with _RATE_LIMIT_LOCK:
+        delay = _rate_limited_until - time.monotonic()
+    if delay > 0:
+        print(f"Rate limit bucket empty, waiting {delay:.2f}s")
+        time.sleep(delay)
+
+
+def safe_post(webhook_url, payload, server_retries: int = 3, method: str = "POST"):
+    """
+    POST to a webhook, retrying on 429 after Discord's advertised reset (plus jitter)
+    and on 5xx with exponential backoff. Other 4xx errors are raised immediately.
+    `method` lets message edits (PATCH) share the same handling.
+    """
+    # Serialize once; every retry resends the same bytes
+    body = json.dumps(payload, ensure_ascii=False, allow_nan=False).encode("utf-8")
+    headers = {"Content-Type": "application/json"}
+
+    delay = 1.0
     while True:
-        resp = requests.post(webhook_url, json=payload)
+        wait_for_rate_limit()
+        resp = SESSION.request(method, webhook_url, data=body, headers=headers)
+        record_rate_limit(resp)
         if resp.status_code == 429:
-            retry_after = resp.json().get("retry_after", 1) / 1000.0
+            # Prefer the rate-limit header; fall back to the body's retry_after
+            reset_after = resp.headers.get("X-RateLimit-Reset-After")
+            if reset_after is not None:
+                retry_after = float(reset_after)
+            else:
+                retry_after = resp.json().get("retry_after", 1) / 1000.0
+            retry_after += random.uniform(0, 0.25 * retry_after)  # jitter avoids a stampede
             print(f"Rate limited, retrying in {retry_after:.2f}s")
             time.sleep(retry_after)
             continue
+        if resp.status_code >= 500 and server_retries > 0:
+            server_retries -= 1
+            print(f"Discord error {resp.status_code}, retrying in {delay:.2f}s")
+            time.sleep(delay)
+            delay *= 2
+            continue
         resp.raise_for_status()
         return resp
     
 
+def embed_chars(embed: dict) -> int:
+    """Count the characters Discord charges against the per-message embed total."""
+    return (
+        len(embed.get("title", ""))
+        + len(embed.get("description", ""))
+        + len(embed.get("author", {}).get("name", ""))
+        + len(embed.get("footer", {}).get("text", ""))
+        + sum(len(field["name"]) + len(field["value"]) for field in embed.get("fields", []))
+    )
+
+
+def batch_embeds(embeds: list) -> List[list]:
+    """Group embeds, in order, into messages within Discord's embed count and size limits."""
+    batches, current, current_chars = [], [], 0
+    for embed in embeds:
+        chars = embed_chars(embed)
+        if current and (len(current) == MAX_EMBEDS_PER_MESSAGE or current_chars + chars > MAX_MESSAGE_EMBED_CHARS):
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(embed)
+        current_chars += chars
+    if current:
+        batches.append(current)
+    return batches
+
+
 def post_embeds_and_get_links(webhook_url: str, guild_id: str, embeds: list) -> list[str]:
     """
     Post embeds for one world and return a list of message links.
+    Embeds are sent several per message, as Discord's limits allow.
     The first item in the list will always be the first message link.
+    `webhook_url` must end in "?wait=true" so Discord returns the created message.
     """
-    if not webhook_url.endswith("?wait=true"):
-        webhook_url = webhook_url + "?wait=true"
-
     links = []
-    for embed in embeds:
-        resp = requests.post(webhook_url, json={"embeds": [embed]})
-        resp.raise_for_status()  # good practice
+    for batch in batch_embeds(embeds):
+        resp = safe_post(webhook_url, {"embeds": batch})
         data = resp.json()
         message_id = data["id"]
         channel_id = data["channel_id"]
@@ -450,7 +696,23 @@ def post_embeds_and_get_links(webhook_url: str, guild_id: str, embeds: list) ->
     return links
 
 
-def build_summary_embed(world_links: dict) -> dict:
+def edit_world_messages(webhook_url: str, links: list, embeds: list) -> None:
+    """
+    Replace the embeds of a world's existing messages in place, one batch per message,
+    so their channel position and jump links stay the same.
+    """
+    for link, batch in zip(links, batch_embeds(embeds)):
+        message_id = link.rsplit("/", 1)[-1]
+        safe_post(f"{webhook_url}/messages/{message_id}", {"embeds": batch}, method="PATCH")
+
+
+def embeds_digest(embeds: list) -> str:
+    """Fingerprint a world's embeds, ignoring the per-run timestamp."""
+    content = [{key: value for key, value in embed.items() if key != "timestamp"} for embed in embeds]
+    return hashlib.blake2b(json.dumps(content, sort_keys=True).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def build_summary_embed(world_links: dict, timestamp: str) -> dict:
     """Build a summary embed linking to the *first* message of each world."""
     lines = [
         f"[{world}]({links[0]})"
@@ -460,7 +722,7 @@ def build_summary_embed(world_links: dict) -> dict:
     return {
         "title": "WvW Guild Lists Summary",
         "description": "\n".join(lines),
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": timestamp
     }
 
 
@@ -469,7 +731,7 @@ def post_summary_embed(webhook_url: str, guild_id: str, summary: dict, msg_links
     Post a summary embed to Discord and update the message links dictionary.
 
     Args:
-        webhook_url (str): URL of the Discord webhook.
+        webhook_url (str): URL of the Discord webhook, ending in "?wait=true".
         guild_id (str): ID of the Discord guild.
         summary (dict): Summary embed data.
         msg_links (dict): Dictionary of world names to message links.
@@ -477,12 +739,8 @@ def post_summary_embed(webhook_url: str, guild_id: str, summary: dict, msg_links
     Returns:
         dict: Updated message links dictionary.
     """
-    # Append "?wait=true" to the webhook URL if not already present
-    if not webhook_url.endswith("?wait=true"):
-        webhook_url = webhook_url + "?wait=true"    
-
     # Post the summary embed to Discord
-    resp = requests.post(webhook_url, json={"embeds": [summary]})
+    resp = safe_post(webhook_url, {"embeds": [summary]})
     data = resp.json()
     message_id = data["id"]
     channel_id = data["channel_id"]
@@ -494,38 +752,55 @@ def post_summary_embed(webhook_url: str, guild_id: str, summary: dict, msg_links
     return msg_links
 
 
-def delete_previous_discord_msgs_for_world_links(WEBHOOK_URL: str, cache_file: str) -> None:
-    """Retrieve cached links and send DELETE requests for each."""
+def _delete_discord_msg(WEBHOOK_URL: str, world_name: str, link: str) -> None:
+    """Send the DELETE request for one cached message link."""
+    try:
+        # Links are https://discord.com/channels/<guild>/<channel>/<message>
+        message_id = link.rsplit("/", 1)[-1]
+        if "/channels/" not in link or not message_id.isdigit():
+            print(f"⚠️ Invalid UI link format for {world_name}: {link}")
+            return
+
+        delete_url = f"{WEBHOOK_URL}/messages/{message_id}"
+
+        wait_for_rate_limit()
+        resp = SESSION.delete(delete_url, timeout=10)
+        record_rate_limit(resp)
+
+        if resp.status_code in (200, 204):
+            print(f"✅ Deleted link for {world_name}: {link}")
+        else:
+            print(f"⚠️ Failed to delete {world_name}: {resp.status_code} {resp.text}")
+
+    except requests.RequestException as e:
+        print(f"❌ Error deleting {world_name}: {e}")
+
+
+def delete_previous_discord_msgs_for_world_links(WEBHOOK_URL: str, cache_file: str, max_workers: int = 4) -> None:
+    """
+    Retrieve cached links and send DELETE requests for each.
+
+    Deletes run on a small thread pool so their round trips overlap; workers only
+    pause when Discord reports the rate-limit bucket as empty.
+    """
     if not os.path.exists(cache_file):
         print(f"⚠️ Prior Message link file {cache_file} not found. Skipping...")
         return
 
     world_links = load_data_file(cache_file)
 
-    for world_name, links in world_links.items():
-        if not isinstance(links, list):
-            links = [links]  # backward compatibility if cache still has single strings
-
-        for link in links:
-            try:
-                parts = urlparse(link).path.strip("/").split("/")
-                if len(parts) < 4 or parts[0] != "channels":
-                    print(f"⚠️ Invalid UI link format for {world_name}: {link}")
-                    continue
-
-                message_id = parts[-1]  # last element is the message_id
-                delete_url = f"{WEBHOOK_URL}/messages/{message_id}"
-
-                resp = requests.delete(delete_url, timeout=10)
-                time.sleep(0.5)
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for world_name, links in world_links.items():
+            if not isinstance(links, list):
+                links = [links]  # backward compatibility if cache still has single strings
 
-                if resp.status_code in (200, 204):
-                    print(f"✅ Deleted link for {world_name}: {link}")
-                else:
-                    print(f"⚠️ Failed to delete {world_name}: {resp.status_code} {resp.text}")
+            for link in links:
+                futures.append(pool.submit(_delete_discord_msg, WEBHOOK_URL, world_name, link))
 
-            except requests.RequestException as e:
-                print(f"❌ Error deleting {world_name}: {e}")
+    # Surface any unexpected error raised inside a worker
+    for future in futures:
+        future.result()
 
 def main():
     # Read config
@@ -538,6 +813,11 @@ def main():
     ALLIANCES_REMOTE_SHEET_URL = config_ini["Settings"]["ALLIANCES_REMOTE_SHEET_URL"]
     SOLO_GUILDS_REMOTE_SHEET_URL = config_ini["Settings"]["SOLO_GUILDS_REMOTE_SHEET_URL"]
 
+    # Posts need "?wait=true" to get the created message back; edits and deletes
+    # address /messages/<id> under the bare webhook URL
+    WEBHOOK_URL = WEBHOOK_URL.removesuffix("?wait=true")
+    POST_WEBHOOK_URL = WEBHOOK_URL + "?wait=true"
+
     parser = argparse.ArgumentParser(
         description="Process WvW guild data and generate Discord embeds.\n\n "
         "The --remote and --local flags are mutually exclusive.",
@@ -553,6 +833,8 @@ def main():
 
     world_links = {}
     world_id_map = gw2_data.NA_wvw_teams
+    # every embed posted or edited by this run carries the same time
+    run_ts = datetime.now(timezone.utc).isoformat()
     
     if not any(vars(args).values()):
         parser.print_help(sys.stderr)
@@ -565,55 +847,97 @@ def main():
         #read data from local files
         alliances, solo_guilds = fetch_guild_data_local()        
 
-    clean_solo_guilds = solo_guilds.dropna()
-    clean_alliances = alliances.dropna()
-    sorted_alliances = clean_alliances.sort_values(by=['World ID', 'Alliance:'], ascending=[True, True])
-    sorted_solo_guilds = clean_solo_guilds.sort_values(by=['World', 'Solo Guilds'], ascending=[True, True])
+    # Drop rows missing a field the embeds need (a blank guild ID alone is fine) and
+    # sort by name only; the per-world groupby below keeps this order within each world
+    sorted_alliances = alliances.dropna(subset=['Alliance:', 'Guilds', 'World ID']).sort_values('Alliance:')
+    sorted_solo_guilds = solo_guilds.dropna(subset=['Solo Guilds', 'World']).sort_values('Solo Guilds')
     
     guild_world_ids = fetch_north_american_guilds(GW2_NA_GUILDS_API_URL)
-    world_list = guild_world_ids['world_id'].unique().tolist()
 
     alliances_df, solo_guilds_df, changed, unchanged = update_world_ids(sorted_alliances, sorted_solo_guilds, guild_world_ids, world_id_map)
 
-    #load previous world data:
-    cached_Alliances = load_data_file("cached_Alliances")
-    cached_Solo_Guilds = load_data_file("cached_Solo_Guilds")
-
-    #compare old to new data
-    if cached_Alliances is not None:
-        compare_results = compare_cached_to_current(cached_Alliances, alliances_df)
-        print("🌐 Moved alliances:", compare_results["counts"]["moved"])
-        print("➕ New alliances:", compare_results["counts"]["new"])
-        print("❌ Removed alliances:", compare_results["counts"]["removed"])
-        if compare_results["counts"]["moved"] > 0:
-            process_embeds = True
-        else:
-            process_embeds = False
+    #fingerprint what would be posted; an unchanged fingerprint means nothing to do.
+    #deleting cached_Alliances still forces the embeds to be rebuilt
+    digest = frame_digest(alliances_df, solo_guilds_df)
+    cached_digest = load_data_file("cached_digest.json") or {}
+
+    if cached_digest.get("digest") == digest and os.path.exists("cached_Alliances"):
+        process_embeds = False
     else:
-        print("⚠️ No cached data found. Skipping comparison and running initial data")
-        process_embeds = True
+        #load previous world data (only alliances are compared)
+        cached_Alliances = load_data_file("cached_Alliances")
+
+        #compare old to new data
+        if cached_Alliances is not None:
+            compare_results = compare_cached_to_current(cached_Alliances, alliances_df)
+            print("🌐 Moved alliances:", compare_results["counts"]["moved"])
+            print("➕ New alliances:", compare_results["counts"]["new"])
+            print("❌ Removed alliances:", compare_results["counts"]["removed"])
+            if compare_results["counts"]["moved"] > 0:
+                process_embeds = True
+            else:
+                process_embeds = False
+        else:
+            print("⚠️ No cached data found. Skipping comparison and running initial data")
+            process_embeds = True
 
     if process_embeds:
 
-        #delete discord messages for each world if previous file exists
-        delete_previous_discord_msgs_for_world_links(WEBHOOK_URL, "previous_discord_messages.json")
+        #partition both frames by world once instead of scanning them per world
+        alliance_groups = dict(tuple(alliances_df.groupby('World ID', sort=False)))
+        solo_by_world = {world: group['Solo Guilds'].tolist() for world, group in solo_guilds_df.groupby('World', sort=False)}
 
         #build_discord_embeds
-        for world_ID, world_name in world_id_map.items():
-            filtered_alliances = alliances_df.loc[alliances_df['World ID'] == world_ID]
-            filtered_solo_guilds = solo_guilds_df.loc[solo_guilds_df['World'] == world_ID]
-            embeds = build_guild_embeds(world_name, filtered_alliances, filtered_solo_guilds)
-            link = post_embeds_and_get_links(WEBHOOK_URL, GUILD_ID, embeds)
-            world_links[world_name] = link
-            time.sleep(0.5)
-
-        # Post the summary embed
-        summary = build_summary_embed(world_links)
-        previous_discord_messages = post_summary_embed(WEBHOOK_URL, GUILD_ID, summary, world_links)
+        world_embeds = {
+            world_name: build_guild_embeds(
+                world_name,
+                alliance_groups.get(world_name, alliances_df.iloc[0:0]),
+                solo_by_world.get(world_name, []),
+                run_ts,
+            )
+            for world_name in world_id_map.values()
+        }
+        world_hashes = {world_name: embeds_digest(embeds) for world_name, embeds in world_embeds.items()}
+
+        #edit only the changed worlds' messages when every world still fits its previous messages
+        previous_discord_messages = load_data_file("previous_discord_messages.json") or {}
+        previous_hashes = load_data_file("cached_world_embeds.json") or {}
+        edited = False
+        if previous_discord_messages.keys() == world_embeds.keys() | {"Summary"} and all(
+            isinstance(previous_discord_messages[world_name], list)
+            and len(previous_discord_messages[world_name]) == len(batch_embeds(embeds))
+            for world_name, embeds in world_embeds.items()
+        ):
+            try:
+                for world_name, embeds in world_embeds.items():
+                    if world_hashes[world_name] != previous_hashes.get(world_name):
+                        print(f"✏️ Updating messages for {world_name}")
+                        edit_world_messages(WEBHOOK_URL, previous_discord_messages[world_name], embeds)
+                # Refresh the summary's timestamp; its links are unchanged
+                kept_links = {world_name: previous_discord_messages[world_name] for world_name in world_embeds}
+                summary_id = previous_discord_messages["Summary"].rsplit("/", 1)[-1]
+                safe_post(f"{WEBHOOK_URL}/messages/{summary_id}", {"embeds": [build_summary_embed(kept_links, run_ts)]}, method="PATCH")
+                edited = True
+            except requests.exceptions.HTTPError as error:
+                print(f"⚠️ Could not edit previous messages ({error}), reposting all worlds")
+
+        if not edited:
+            #delete discord messages for each world if previous file exists
+            delete_previous_discord_msgs_for_world_links(WEBHOOK_URL, "previous_discord_messages.json")
+
+            for world_name, embeds in world_embeds.items():
+                world_links[world_name] = post_embeds_and_get_links(POST_WEBHOOK_URL, GUILD_ID, embeds)
+
+            # Post the summary embed
+            summary = build_summary_embed(world_links, run_ts)
+            previous_discord_messages = post_summary_embed(POST_WEBHOOK_URL, GUILD_ID, summary, world_links)
+
         #save discord messages to cache file for reference on future deletions
         cache_data_file(previous_discord_messages, "previous_discord_messages.json")
+        cache_data_file(world_hashes, "cached_world_embeds.json")
         cache_data_file(alliances_df, "cached_Alliances")
         cache_data_file(solo_guilds_df, "cached_Solo_Guilds")
+        cache_data_file({"digest": digest}, "cached_digest.json")
     else:
         print("⚠️ No new data found. Skipping embeds and summary.")
 